@@ -223,6 +223,12 @@ setup(
 
     packages=find_packages(),  # finds all the .py files in subdirectories
 
+    package_data={
+        'cardinal_pythonlib': [
+            '_unicode_category_src.json',  # see text.py
+        ],
+    },
+
     install_requires=requirements,  # see requirements.txt
 
     entry_points={